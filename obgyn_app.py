@@ -25,7 +25,9 @@ SOFTWARE.
 
 
 import streamlit as st
+import numpy as np
 import random
+from types import SimpleNamespace
 from datetime import datetime, timedelta, date
 
 # --- 1. Page Config ---
@@ -199,30 +201,124 @@ def dropdown_date_input(label_key, default_date=None):
     return date(sel_y, sel_m, sel_d)
 
 
-def generate_human_logic_html(start_date, end_date):
+# --- NEW: Dating Rule Profiles ---
+# Every number the trainer used to hard-code lives here.
+# cycle_length drives Parikh's adjustment: EDD moves by (cycle - 28) days.
+DATING_PROFILES = {
+    "Naegele (Standard)": {
+        "gestation_days": 280,
+        "cycle_length": 28,
+        "edd_tolerance": 3,
+        "count_up_threshold": 105,
+        "short_gap_days": 28,
+    },
+    "Naegele (Exam Strict)": {
+        "gestation_days": 280,
+        "cycle_length": 28,
+        "edd_tolerance": 0,
+        "count_up_threshold": 105,
+        "short_gap_days": 28,
+    },
+    "Parikh (Cycle Adjusted)": {
+        "gestation_days": 280,
+        "cycle_length": 28,
+        "edd_tolerance": 3,
+        "count_up_threshold": 105,
+        "short_gap_days": 28,
+    },
+    "Mittendorf (Multipara)": {
+        "gestation_days": 283,
+        "cycle_length": 28,
+        "edd_tolerance": 3,
+        "count_up_threshold": 105,
+        "short_gap_days": 28,
+    },
+}
+
+# Profiles that let the user type in the patient's own cycle length
+CYCLE_ADJUSTABLE_PROFILES = {"Parikh (Cycle Adjusted)"}
+
+# Mental math strategies picked by rules.strategy()
+STRATEGY_SHORT_GAP = 0
+STRATEGY_MONTH_WALK = 1
+STRATEGY_COUNT_UP = 2
+
+@st.cache_resource
+def compile_dating_kernels(gestation_days, cycle_length, edd_tolerance, count_up_threshold, short_gap_days):
+    """
+    Bakes one profile's numbers into batched NumPy kernels.
+    Cached per profile, so switching profiles on a rerun is just a lookup.
+    Kernels take single dates or whole arrays (anything that casts to datetime64[D]).
+    """
+    lmp_to_edd_days = gestation_days + (cycle_length - 28)
+    edd_offset = np.timedelta64(lmp_to_edd_days, "D")
+    term_weeks, term_days = divmod(gestation_days, 7)
+
+    def as_days(d):
+        return np.asarray(d, dtype="datetime64[D]")
+
+    def edd(lmp):
+        return as_days(lmp) + edd_offset
+
+    def poa(current, redd):
+        # Returns (days_remaining, days_elapsed, weeks, days)
+        days_remaining = (as_days(redd) - as_days(current)).astype(np.int64)
+        days_elapsed = gestation_days - days_remaining
+        weeks, days = np.divmod(days_elapsed, 7)
+        return days_remaining, days_elapsed, weeks, days
+
+    def grade_edd(user_edd, lmp):
+        # Returns (is_correct, days_off)
+        days_off = np.abs((as_days(user_edd) - edd(lmp)).astype(np.int64))
+        return days_off <= edd_tolerance, days_off
+
+    def grade_poa(user_weeks, user_days, current, redd):
+        _, _, weeks, days = poa(current, redd)
+        return (np.asarray(user_weeks) == weeks) & (np.asarray(user_days) == days)
+
+    def strategy(days_remaining):
+        days_remaining = np.asarray(days_remaining)
+        return np.where(days_remaining >= count_up_threshold, STRATEGY_COUNT_UP,
+                        np.where(days_remaining < short_gap_days, STRATEGY_SHORT_GAP, STRATEGY_MONTH_WALK))
+
+    return SimpleNamespace(
+        gestation_days=gestation_days,
+        cycle_length=cycle_length,
+        edd_tolerance=edd_tolerance,
+        lmp_to_edd_days=lmp_to_edd_days,
+        # Naegele's "+7 days" step, shifted by whatever the profile adds on top of 280
+        naegele_add_days=7 + (lmp_to_edd_days - 280),
+        term_weeks=term_weeks,
+        term_days=term_days,
+        edd=edd,
+        poa=poa,
+        grade_edd=grade_edd,
+        grade_poa=grade_poa,
+        strategy=strategy,
+    )
+
+
+def generate_human_logic_html(start_date, end_date, rules):
     """
     Simulates a 'Start Fragment -> Middle Blocks -> End Fragment' walkthrough.
     Fixed to ensure days sum up exactly to (end - start).days
+    Term length and the short gap cut-off come from the active dating profile.
     """
     total_days = (end_date - start_date).days
+    term_w, term_d = rules.term_weeks, rules.term_days
     
-    # 1. Short Gap Strategy (< 28 days)
-    if total_days < 28:
+    # 1. Short Gap Strategy (< 28 days by default)
+    if rules.strategy(total_days) == STRATEGY_SHORT_GAP:
          weeks = total_days // 7
          days = total_days % 7
          
-         countdown_w = 40 - weeks
-         if days > 0:
-             countdown_w -= 1
-             countdown_d = 7 - days
-         else:
-             countdown_d = 0
+         countdown_w, countdown_d = divmod(rules.gestation_days - total_days, 7)
              
          return f"""
          <div class="logic-hint"><strong>⚡ Short Gap Strategy</strong><br>Less than a month. Just count weeks directly.</div>
          <div class="logic-step"><strong>1. The Gap</strong><br>{total_days} days.</div>
          <div class="logic-step"><strong>2. Weeks</strong><br>{total_days} ÷ 7 = <strong>{weeks}w {days}d</strong>.</div>
-         <div class="logic-final">Countdown: 40w 0d - {weeks}w {days}d = <strong>{countdown_w}w {countdown_d}d</strong></div>
+         <div class="logic-final">Countdown: {term_w}w {term_d}d - {weeks}w {days}d = <strong>{countdown_w}w {countdown_d}d</strong></div>
          """
 
     # 2. Long Gap Strategy (The Month Walk)
@@ -290,15 +386,10 @@ def generate_human_logic_html(start_date, end_date):
     </div>"""
     
     # --- Countdown ---
-    final_poa_w = 40 - total_gap_weeks
-    if total_gap_days > 0:
-        final_poa_w -= 1
-        final_poa_d = 7 - total_gap_days
-    else:
-        final_poa_d = 0
+    final_poa_w, final_poa_d = divmod(rules.gestation_days - (total_gap_weeks * 7 + total_gap_days), 7)
         
-    html_output += f"""<div class="logic-final"><strong>3. The Countdown (40w - Gap)</strong><br>
-    40w 0d − {total_gap_weeks}w {total_gap_days}d = <strong>{final_poa_w}w {final_poa_d}d</strong>
+    html_output += f"""<div class="logic-final"><strong>3. The Countdown ({term_w}w {term_d}d - Gap)</strong><br>
+    {term_w}w {term_d}d − {total_gap_weeks}w {total_gap_days}d = <strong>{final_poa_w}w {final_poa_d}d</strong>
     </div>"""
     
     return html_output
@@ -311,6 +402,18 @@ if 'redd_start' not in st.session_state:
 if 'redd_target' not in st.session_state:
     st.session_state['redd_target'] = None
 
+# --- NEW: Dating Rule Selection ---
+with st.sidebar:
+    st.markdown("##### ⚙️ Dating Rules")
+    profile_name = st.selectbox("Rule Profile", list(DATING_PROFILES), key="profile_name")
+    profile = dict(DATING_PROFILES[profile_name])
+    if profile_name in CYCLE_ADJUSTABLE_PROFILES:
+        profile["cycle_length"] = int(st.number_input("Cycle Length (days)", 21, 45, value=profile["cycle_length"], step=1))
+    st.caption(f"Gestation {profile['gestation_days']}d · Cycle {profile['cycle_length']}d · "
+               f"EDD tolerance ±{profile['edd_tolerance']}d · Count-up from {profile['count_up_threshold']}d left")
+
+rules = compile_dating_kernels(**profile)
+
 # --- 5. Main App Layout ---
 col1, col2 = st.columns([1, 2]) 
 with col1:
@@ -374,7 +477,7 @@ if mode == "🤰 EDD (Naegele's Rule)":
         if input_type == "📅 Calendar":
             # --- MODIFICATION: Using new dropdown input ---
             # Default to LMP + 9 months to be helpful
-            approx_edd = lmp + timedelta(days=280)
+            approx_edd = rules.edd(lmp).item()
             user_date = dropdown_date_input("edd_input", default_date=approx_edd)
         else:
             date_str = st.text_input("Type EDD", placeholder="DD/MM/YYYY", key="edd_input_text")
@@ -388,13 +491,14 @@ if mode == "🤰 EDD (Naegele's Rule)":
         
         if st.button("✅ Submit", key="submit_edd"):
             if user_date:
-                correct_edd = lmp + timedelta(days=280)
-                diff = abs((user_date - correct_edd).days)
+                correct_edd = rules.edd(lmp).item()
+                is_correct, diff = rules.grade_edd(user_date, lmp)
+                diff = int(diff)
                 
                 step1_year = lmp.replace(year=lmp.year + 1)
                 step2_months = subtract_months(step1_year, 3)
                 
-                if diff <= 3:
+                if is_correct:
                     st.success(f"**Correct!** (Within {diff} days)")
                     st.balloons()
                 else:
@@ -402,7 +506,7 @@ if mode == "🤰 EDD (Naegele's Rule)":
                 
                 c1, c2 = st.columns(2)
                 c1.metric("Your Answer", format_date(user_date))
-                c2.metric("Exact 280 Days", format_date(correct_edd))
+                c2.metric(f"Exact {rules.lmp_to_edd_days} Days", format_date(correct_edd))
                 
                 with st.expander("📝 View Step-by-Step Logic", expanded=True):
                     st.markdown(f"""
@@ -419,11 +523,11 @@ if mode == "🤰 EDD (Naegele's Rule)":
                         {format_date(step2_months)}
                     </div>
                     <div class="logic-step">
-                        <strong>Step 4: Add 7 Days</strong><br>
-                        {format_date(step2_months + timedelta(days=7))}
+                        <strong>Step 4: Add {rules.naegele_add_days} Days</strong><br>
+                        {format_date(step2_months + timedelta(days=rules.naegele_add_days))}
                     </div>
                     <div class="logic-final">
-                        <strong>Computer Exact (280 Days):</strong><br>
+                        <strong>Computer Exact ({rules.lmp_to_edd_days} Days):</strong><br>
                         {format_date(correct_edd)}
                     </div>
                     """, unsafe_allow_html=True)
@@ -476,7 +580,7 @@ else:
         custom_current = dropdown_date_input("ga_current_input", default_date=date.today())
         
         st.write("REDD (Due Date):")
-        custom_redd = dropdown_date_input("ga_redd_input", default_date=date.today() + timedelta(days=280))
+        custom_redd = dropdown_date_input("ga_redd_input", default_date=date.today() + timedelta(days=rules.gestation_days))
         
         st.session_state['redd_start'] = custom_current
         st.session_state['redd_target'] = custom_redd
@@ -512,10 +616,7 @@ else:
             u_days = st.number_input("Days", 0, 6, step=1)
             
         if st.button("✅ Submit", key="submit_ga"):
-            days_remaining = (redd - current).days
-            days_elapsed = 280 - days_remaining
-            correct_w = days_elapsed // 7
-            correct_d = days_elapsed % 7
+            days_remaining, days_elapsed, correct_w, correct_d = (int(x) for x in rules.poa(current, redd))
             
             # 1. CHECK: Negative Age (Time Traveler)
             if correct_w < 0:
@@ -551,7 +652,7 @@ else:
                 """, unsafe_allow_html=True)
             
             # 3. CHECK: Correct Answer
-            elif u_weeks == correct_w and u_days == correct_d:
+            elif rules.grade_poa(u_weeks, u_days, current, redd):
                 st.success("**Correct!** Spot on.")
                 st.balloons()
 
@@ -563,8 +664,8 @@ else:
             # --- MENTAL MATH STRATEGY (Only show if date is valid) ---
             if 0 <= correct_w <= 50:
                 with st.expander("🧠 Mental Math Strategy (How to think)", expanded=True):
-                    if days_remaining < 105:
-                         st.markdown(generate_human_logic_html(current, redd), unsafe_allow_html=True)
+                    if rules.strategy(days_remaining) != STRATEGY_COUNT_UP:
+                         st.markdown(generate_human_logic_html(current, redd, rules), unsafe_allow_html=True)
                     else:
                         st.markdown(f"""
                         <div class="logic-hint">
@@ -573,7 +674,7 @@ else:
                         </div>
                         <div class="logic-step">
                             <strong>1. Total Days Passed</strong><br>
-                            280 (Full Term) − {days_remaining} (Remaining) = <strong>{days_elapsed} days</strong>.
+                            {rules.gestation_days} (Full Term) − {days_remaining} (Remaining) = <strong>{days_elapsed} days</strong>.
                         </div>
                         <div class="logic-step">
                             <strong>2. Convert to Weeks</strong><br>